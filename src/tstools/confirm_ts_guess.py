@@ -1,7 +1,7 @@
 import numpy as np
 import autode as ade
 import os
-from scipy.spatial import distance_matrix
+from scipy.spatial.distance import cdist
 import re
 from autode.species.species import Species
 from typing import Optional
@@ -9,6 +9,8 @@ import subprocess
 
 xtb = ade.methods.XTB()
 
+normal_mode_pattern = re.compile(r'\s+(\d+)\s+\d+\s+([-+]?\d+\.\d+)\s+([-+]?\d+\.\d+)\s+([-+]?\d+\.\d+)')
+
 
 def validate_ts_guess(ts_guess_file, path, freq_cut_off=150, charge=0, solvent=None):
     """
@@ -73,8 +75,8 @@ def extract_info_ts_file(ts_file, path, charge, solvent):
     b_displaced_species = displaced_species_along_mode(reactant, normal_mode, disp_factor=-1)
 
     # Compute distance matrices -- TS geometry obtained through displacement along imaginary mode
-    f_distances = distance_matrix(f_displaced_species.coordinates, f_displaced_species.coordinates)
-    b_distances = distance_matrix(b_displaced_species.coordinates, b_displaced_species.coordinates)
+    f_distances = cdist(f_displaced_species.coordinates, f_displaced_species.coordinates)
+    b_distances = cdist(b_displaced_species.coordinates, b_displaced_species.coordinates)
 
     # Compute delta_mode
     delta_mode = f_distances - b_distances
@@ -114,22 +116,21 @@ def read_first_normal_mode(filename):
         float: Frequency value.
     """
     normal_mode = []
-    pattern = r'\s+(\d+)\s+\d+\s+([-+]?\d+\.\d+)\s+([-+]?\d+\.\d+)\s+([-+]?\d+\.\d+)'
 
     # Open the file and read its contents
     with open(filename, 'r') as file:
         lines = file.readlines()
         # Iterate over the lines and find the matching pattern
-        for line in lines:
+        for line_idx, line in enumerate(lines):
             # Check if the line contains a frequency
             if 'Frequencies' in line:
                 # Extract the frequency value from the line
                 frequency = float(line.split('--')[1].split()[0])
 
                 # Iterate over the lines below the frequency line
-                for sub_line in lines[lines.index(line) + 7:]:
+                for sub_line in lines[line_idx + 7:]:
                     # Check if the line matches the pattern
-                    match = re.search(pattern, sub_line)
+                    match = normal_mode_pattern.search(sub_line)
                     if match:
                         x = float(match.group(2))
                         y = float(match.group(3))
@@ -270,13 +271,12 @@ def read_negative_frequencies(filename):
         filename: The name of the file.
 
     Returns:
-        list: The list of negative frequencies.
+        list: The list of negative frequencies (as floats).
     """
     with open(filename, 'r') as file:
         for line in file:
-            if line.strip().startswith('Frequencies --'):
-                frequencies = line.strip().split()[2:]
-                negative_frequencies = [freq for freq in frequencies if float(freq) < 0]
-                return negative_frequencies
+            if line.lstrip().startswith('Frequencies --'):
+                frequencies = np.array(line.split()[2:], dtype=float)
+                return frequencies[frequencies < 0].tolist()
 
 
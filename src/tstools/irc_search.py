@@ -3,6 +3,8 @@ import autode as ade
 import os
 from autode.mol_graphs import make_graph
 import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 
 atomic_number_to_symbol = {
     1: 'H',  2: 'He',  3: 'Li',  4: 'Be',  5: 'B',
@@ -191,7 +193,7 @@ def write_xtb_input_file(xyz_path):
     Returns:
     str: Path to the created XTB input file.
     """
-    file_path = os.path.join(os.path.dirname(xyz_path), 'xtb.inp')
+    file_path = f'{os.path.splitext(xyz_path)[0]}_xtb.inp'
     input_block = """
     $wall
     potential=logfermi
@@ -217,10 +219,13 @@ def optimize_final_point_irc(xyz_file, charge, multiplicity, solvent=None):
 
     Returns:
     None: The function writes the optimized coordinates to an output file.
+
+    Notes:
+    - xTB is run in a temporary scratch directory, so that concurrent runs do not share restart/output files.
     """
     inp_path = write_xtb_input_file(xyz_file)
-    with open(f'{xyz_file[:-4]}.out', 'w') as out:
-        cmd = f'xtb --input {inp_path} {xyz_file} --opt --cma --charge {charge} '
+    with open(f'{xyz_file[:-4]}.out', 'w') as out, tempfile.TemporaryDirectory() as scratch_dir:
+        cmd = f'xtb --input {os.path.abspath(inp_path)} {os.path.abspath(xyz_file)} --opt --cma --charge {charge} '
 
         if multiplicity == 1:
             pass
@@ -230,7 +235,7 @@ def optimize_final_point_irc(xyz_file, charge, multiplicity, solvent=None):
         if solvent is not None:
             cmd += f'--alpb {solvent} '
 
-        process = subprocess.Popen(cmd.split(), stderr=subprocess.DEVNULL, stdout=out)
+        process = subprocess.Popen(cmd.split(), stderr=subprocess.DEVNULL, stdout=out, cwd=scratch_dir)
         process.wait()
 
     extract_coordinates(f'{xyz_file[:-4]}.out')
@@ -273,9 +278,12 @@ def compare_molecules_irc(forward_xyz, reverse_xyz, reactant_xyz, product_xyz, c
     Returns:
     bool: True if the molecular graphs match for any relative tolerance, False otherwise.
     """
-    # first reoptimize the final points
-    optimize_final_point_irc(forward_xyz, charge, multiplicity, solvent)
-    optimize_final_point_irc(reverse_xyz, charge, multiplicity, solvent)
+    # first reoptimize the final points (both optimizations are independent, so run them concurrently)
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        futures = [executor.submit(optimize_final_point_irc, xyz_file, charge, multiplicity, solvent)
+                   for xyz_file in (forward_xyz, reverse_xyz)]
+        for future in futures:
+            future.result()
     # then take final geometry and do actual comparison
     forward_mol = ade.Molecule(f'{forward_xyz[:-4]}_opt.xyz', name='forward', charge=charge, mult=multiplicity)
     reverse_mol = ade.Molecule(f'{reverse_xyz[:-4]}_opt.xyz', name='reverse', charge=charge, mult=multiplicity)
@@ -4,14 +4,15 @@ import autode as ade
 import os
 from autode.conformers import conf_gen
 from autode.conformers import conf_gen, Conformer
-from scipy.spatial import distance_matrix
-import copy
+from autode.atoms import Atom
+from autode.mol_graphs import make_graph
+from math import dist
 import subprocess
 import shutil
-import random
 from itertools import product
 
 from typing import Optional
+from dataclasses import dataclass
 from autode.smiles.smiles import init_smiles
 
 from rdkit import RDLogger
@@ -22,6 +23,8 @@ from tstools.utils import write_xyz_file_from_ade_atoms
 ps = Chem.SmilesParserParams()
 ps.removeHs = False
 bohr_ang = 0.52917721090380
+# rounded factor of the former angstrom_to_bohr helper, kept so that the potentials stay exactly the same (1 / bohr_ang = 1.8897261...)
+ang_bohr = 1.88973
 
 xtb = ade.methods.XTB()
 
@@ -50,6 +53,8 @@ class PathGenerator:
     STRETCH_FACTOR_LOWER_BOUND = 1.0
     STRETCH_FACTOR_UPPER_BOUND = 1.3
 
+    MAX_IDENTICAL_STEREO_FRACTION = 0.5
+
     def __init__(self, reactant_smiles, product_smiles, rxn_id, path_dir, rp_geometries_dir, 
                  solvent=None, reactive_complex_factor=2.0, freq_cut_off=150, charge=0, multiplicity=1, n_conf=100):
         """
@@ -98,6 +103,7 @@ class PathGenerator:
         self.reaction_is_organometallic = self.check_if_reaction_organometallic()
 
         self.formation_constraints = self.get_optimal_distances()
+        self.formation_constraint_arrays = Constraints.from_dict(self.formation_constraints)
 
         self.stereo_correct_conformer_name = self.get_stereo_correct_conformer_name(n_conf)
 
@@ -189,41 +195,100 @@ class PathGenerator:
 
         Returns:
         float or None: The found force constant or None if not found.
+
+        Notes:
+        - The range is probed upwards from its lower end with growing steps; once a force constant reaches
+          the products, the interval with the last failing force constant is bisected.
+        - Every attempt starts from a randomly stretched reactive complex, so the outcome is not strictly monotone
+          in the force constant; if none of the probes succeeds, the skipped values are screened as well before giving up.
+        - The reactive complex of the returned force constant is restored, since get_path starts from it.
         """
         if n_attempts > 2:
             self.stereo_correct_conformer_name = self.get_stereo_correct_conformer_name(self.n_conf)
 
-        for fc in np.arange(start, end, interval):
-            for _ in range(n_attempts):
-                reactive_complex_xyz_file = self.get_reactive_complex(min(fc, PathGenerator.MAX_FORCE_CONSTANT))
-                _, _, _, potentials = self.get_path_for_biased_optimization(reactive_complex_xyz_file, fc)
+        fc_values = np.arange(start, end, interval)
+        probed_indices = []
+        upper = None
+
+        # bracket upwards from the lower end of the range (indices 0, 1, 3, 7, ...)
+        idx, step = 0, 1
+        while upper is None and idx < len(fc_values):
+            probed_indices.append(idx)
+            if self.fc_reaches_products(fc_values[idx], n_attempts):
+                upper = idx
+            elif idx == len(fc_values) - 1:
+                break
+            else:
+                idx, step = min(idx + step, len(fc_values) - 1), step * 2
 
-                if potentials[-1] < PathGenerator.POTENTIAL_THRESHOLD:
-                    return fc
+        if upper is None:
+            # screen the values skipped while bracketing, in increasing order
+            for idx in range(len(fc_values)):
+                if idx not in probed_indices and self.fc_reaches_products(fc_values[idx], n_attempts):
+                    upper = idx
+                    break
+            else:
+                return None
+        elif len(probed_indices) > 1:
+            # bisect between the last force constant that failed and the first one that succeeded
+            lower = probed_indices[-2]
+            while upper - lower > 1:
+                middle = (lower + upper) // 2
+                if self.fc_reaches_products(fc_values[middle], n_attempts):
+                    upper = middle
                 else:
-                    continue
+                    lower = middle
 
-        return None
+        # the returned force constant always corresponds to the most recent successful run
+        shutil.copy(f'{self.stereo_correct_conformer_name}_opt_reached.xyz',
+                    f'{self.stereo_correct_conformer_name}_opt.xyz')
+
+        return fc_values[upper]
+
+    def fc_reaches_products(self, fc, n_attempts):
+        """
+        Check whether a biased optimization with the given force constant reaches the products.
+
+        Parameters:
+        - fc (float): The force constant to test.
+        - n_attempts (int): Number of attempts, each starting from a newly generated reactive complex.
+
+        Returns:
+        bool: True if any of the attempts ends below the potential threshold, False otherwise.
+
+        Notes:
+        - The reactive complex of a successful attempt is saved, so that it can be restored afterwards.
+        """
+        for _ in range(n_attempts):
+            reactive_complex_xyz_file = self.get_reactive_complex(min(fc, PathGenerator.MAX_FORCE_CONSTANT))
+            _, _, _, potentials = self.get_path_for_biased_optimization(reactive_complex_xyz_file, fc)
+
+            if potentials[-1] < PathGenerator.POTENTIAL_THRESHOLD:
+                shutil.copy(reactive_complex_xyz_file, f'{self.stereo_correct_conformer_name}_opt_reached.xyz')
+                return True
+
+        return False
 
     def get_formation_constraints_stretched(self):
         """
         Get stretched formation constraints for bonds that are to be stretched.
 
         Returns:
-        dict: Dictionary of stretched formation constraints.
+        Constraints: The stretched formation constraints.
         """
         formation_constraints_to_stretch = self.get_bonds_to_stretch()
-        formation_constraints_stretched = {}
-
-        for bond, original_distance in self.formation_constraints.items():
-            if bond in formation_constraints_to_stretch:
-                stretch_factor = random.uniform(
-                    PathGenerator.STRETCH_FACTOR_LOWER_BOUND * self.reactive_complex_factor,
-                    PathGenerator.STRETCH_FACTOR_UPPER_BOUND * self.reactive_complex_factor
-                )
-                formation_constraints_stretched[bond] = stretch_factor * original_distance
+        constraint_arrays = self.formation_constraint_arrays
+        mask = np.array([bond in formation_constraints_to_stretch
+                         for bond in zip(constraint_arrays.idx_i.tolist(), constraint_arrays.idx_j.tolist())], dtype=bool)
+        constraints_to_stretch = constraint_arrays.select(mask)
+
+        stretch_factors = np.random.uniform(
+            PathGenerator.STRETCH_FACTOR_LOWER_BOUND * self.reactive_complex_factor,
+            PathGenerator.STRETCH_FACTOR_UPPER_BOUND * self.reactive_complex_factor,
+            size=len(constraints_to_stretch)
+        )
 
-        return formation_constraints_stretched
+        return constraints_to_stretch.stretched(stretch_factors)
     
     def get_stereo_correct_conformer_name(self, n_conf=100):
         """
@@ -235,8 +300,9 @@ class PathGenerator:
         Returns:
         str or None: The name of the conformer or None if not found.
         """
+        # autodE expects the distance constraints as a dictionary
         if self.reactive_complex_factor > 0.01:
-            formation_constraints_stretched = self.get_formation_constraints_stretched()
+            formation_constraints_stretched = self.get_formation_constraints_stretched().to_dict()
         else:
             formation_constraints_stretched = {}
 
@@ -262,17 +328,32 @@ class PathGenerator:
 
         ade_mol.graph.edges = bonds
 
+        no_stereo_reactant_mol = get_mol_without_stereochemistry(self.reactant_smiles)
+
         # find good starting conformer
+        max_identical_stereochemistry = max(1, int(n_conf * PathGenerator.MAX_IDENTICAL_STEREO_FRACTION))
+        previous_stereochemistry, n_identical_stereochemistry = None, 0
         for n in range(n_conf):
             atoms = conf_gen.get_simanl_atoms(species=ade_mol, dist_consts=formation_constraints_stretched, conf_n=n, save_xyz=False) # set save_xyz to false to ensure new optimization
             conformer = Conformer(name=f"conformer_reactants_init", atoms=atoms, charge=self.charge, dist_consts=formation_constraints_stretched)
             write_xyz_file_from_ade_atoms(atoms, f'{conformer.name}.xyz')
-            stereochemistry_conformer = get_stereochemistry_from_conformer_xyz(f'{conformer.name}.xyz', self.reactant_smiles)
+            stereochemistry_conformer = get_stereochemistry_from_conformer_xyz(f'{conformer.name}.xyz', self.reactant_smiles,
+                                                                               no_stereo_reactant_mol)
             stereochemistry_conformer = [str(d) for d in stereochemistry_conformer if str(d['position']) in stereo_elements_to_consider]
 
             if set(stereochemistry_smiles) == set(stereochemistry_conformer):
                 return conformer.name
 
+            # with stretched constraints, the same incorrect stereochemistry can keep coming back (possibly because the
+            # constraints favor it); stop retrying once it has repeated for a fixed fraction of n_conf in a row
+            if formation_constraints_stretched:
+                if set(stereochemistry_conformer) == previous_stereochemistry:
+                    n_identical_stereochemistry += 1
+                    if n_identical_stereochemistry >= max_identical_stereochemistry:
+                        break
+                else:
+                    previous_stereochemistry, n_identical_stereochemistry = set(stereochemistry_conformer), 1
+
         # print that there is an error with the stereochemistry only when you do a full search, i.e., n_conf > 1
         if n_conf > 1:
             print(f'No stereo-compatible conformer found for reaction {self.rxn_id}')
@@ -292,7 +373,7 @@ class PathGenerator:
         if self.reactive_complex_factor > 0.01:
             formation_constraints_stretched = self.get_formation_constraints_stretched()
         else:
-            formation_constraints_stretched = {}
+            formation_constraints_stretched = Constraints.from_dict({})
 
         self.optimize_reactive_complex(formation_constraints_stretched, fc)
 
@@ -303,20 +384,14 @@ class PathGenerator:
         Optimize the geometry of a reactive complex using the xTB quantum chemistry package.
 
         Args:
-            formation_constraints_stretched (dict): A dictionary containing the formation constraints stretched.
+            formation_constraints_stretched (Constraints): The stretched formation constraints.
             fc (float): Force constant for the constraint during optimization.
 
         Raises:
             RuntimeError: If an error occurs during the xTB optimization process.
         """
         xtb_input_path = f'{self.stereo_correct_conformer_name}.inp'
-
-        with open(xtb_input_path, 'w') as f:
-            f.write('$constrain\n')
-            f.write(f'    force constant={fc}\n')
-            for key, val in formation_constraints_stretched.items():
-                f.write(f'    distance: {key[0] + 1}, {key[1] + 1}, {val}\n')
-            f.write('$end\n')
+        write_xtb_constraint_input(xtb_input_path, formation_constraints_stretched, fc)
 
         cmd = f'xtb {self.stereo_correct_conformer_name}.xyz --opt --input {xtb_input_path} -v --charge {self.charge} '
 
@@ -354,7 +429,7 @@ class PathGenerator:
             valid_atoms.append(all_atoms[i])
             valid_energies.append(all_energies[i])
 
-        potentials = determine_potential(valid_coords, self.formation_constraints, force_constant)
+        potentials = determine_potential(valid_coords, self.formation_constraint_arrays, force_constant)
 
         return valid_energies, valid_coords, valid_atoms, potentials
 
@@ -370,13 +445,7 @@ class PathGenerator:
         str: Path to the XTB optimization log file.
         """
         xtb_input_path = f'{os.path.splitext(reactive_complex_xyz_file)[0]}.inp'
-
-        with open(xtb_input_path, 'w') as f:
-            f.write('$constrain\n')
-            f.write(f'    force constant={fc}\n')
-            for key, val in self.formation_constraints.items():
-                f.write(f'    distance: {key[0] + 1}, {key[1] + 1}, {val}\n')
-            f.write('$end\n')
+        write_xtb_constraint_input(xtb_input_path, self.formation_constraint_arrays, fc)
 
         cmd = f'xtb {reactive_complex_xyz_file} --opt --input {xtb_input_path} -v --charge {self.charge} '
 
@@ -448,6 +517,8 @@ class PathGenerator:
         product_molecules = [Chem.MolFromSmiles(smi, ps) for smi in self.product_smiles.split('.')]
         formed_bonds = self.formed_bonds
 
+        # each product molecule only needs to be optimized once, regardless of the number of bonds formed in it
+        optimized_coordinates = {}
         atoms_involved_in_formed_bonds = []
 
         for bond in formed_bonds:
@@ -457,7 +528,8 @@ class PathGenerator:
             idx1, idx2 = self.atom_map_dict[atom_i], self.atom_map_dict[atom_j]
 
             mol, mol_dict, smiles = self.get_mol_and_mol_dict(atom_i, atom_j, product_molecules, product_smiles)
-            current_bond_length = self.obtain_current_distance(mol, mol_dict, smiles, atom_i, atom_j)
+            current_bond_length = self.obtain_current_distance(mol, mol_dict, smiles, atom_i, atom_j,
+                                                               optimized_coordinates)
  
             optimal_distances[idx1, idx2] = current_bond_length
 
@@ -474,7 +546,8 @@ class PathGenerator:
                 if (min(atom_i, atom_j), max(atom_i, atom_j)) in self.broken_bonds:
                     idx1, idx2 = self.atom_map_dict[atom_i], self.atom_map_dict[atom_j]
                     mol, mol_dict, smiles = self.get_mol_and_mol_dict(atom_i, atom_j, product_molecules, product_smiles)
-                    current_distance = self.obtain_current_distance(mol, mol_dict, smiles, atom_i, atom_j)
+                    current_distance = self.obtain_current_distance(mol, mol_dict, smiles, atom_i, atom_j,
+                                                                    optimized_coordinates)
                     optimal_distances[min(idx1, idx2), max(idx1, idx2)] = current_distance
                     break
                 else:
@@ -493,14 +566,14 @@ class PathGenerator:
         - product_molecules (dict): Dictionary mapping atom indices to corresponding molecules.
 
         Returns:
-        - mol (rdkit.Chem.Mol): A deep copy of the molecule containing 'atom_i' and 'atom_j'.
+        - mol (rdkit.Chem.Mol): A copy of the molecule containing 'atom_i' and 'atom_j'.
         - mol_dict (dict): A dictionary mapping atom map numbers to atom indices in 'mol'.
 
         Raises:
         - KeyError: If atoms 'atom_i' and 'atom_j' belong to different molecules.
         """
         if self.owning_dict_psmiles[atom_i] == self.owning_dict_psmiles[atom_j]:
-                mol = copy.deepcopy(product_molecules[self.owning_dict_psmiles[atom_i]])
+                mol = Chem.Mol(product_molecules[self.owning_dict_psmiles[atom_i]])
                 smiles = product_smiles[self.owning_dict_psmiles[atom_i]]
         else:
             raise KeyError("Atoms in the bond belong to different molecules.")
@@ -509,7 +582,7 @@ class PathGenerator:
         
         return mol, mol_dict, smiles
     
-    def obtain_current_distance(self, mol, mol_dict, smiles, atom_i, atom_j):
+    def obtain_current_distance(self, mol, mol_dict, smiles, atom_i, atom_j, optimized_coordinates=None):
         """
         Calculate the current distance between two atoms in the molecule.
 
@@ -519,51 +592,57 @@ class PathGenerator:
         - smiles (string): The molecule SMILES.
         - atom_i (int): Index of the first atom.
         - atom_j (int): Index of the second atom.
+        - optimized_coordinates (dict, optional): Cache mapping molecule SMILES to previously optimized coordinates.
 
         Returns:
         - current_distance (float): The distance between the specified atoms in the molecule.
 
         Notes:
-        - The function internally uses the obtain_dist_matrix method to compute the distance matrix.
+        - The function internally uses the obtain_optimized_coordinates method to get the geometry.
+        - If a cache is provided, the geometry is only optimized the first time a molecule is encountered.
         """  
-        dist_matrix = self.obtain_dist_matrix(mol, smiles)
-        current_distance = dist_matrix[mol_dict[atom_i], mol_dict[atom_j]]
+        if optimized_coordinates is None:
+            coordinates = self.obtain_optimized_coordinates(mol, smiles)
+        else:
+            if smiles not in optimized_coordinates:
+                optimized_coordinates[smiles] = self.obtain_optimized_coordinates(mol, smiles)
+            coordinates = optimized_coordinates[smiles]
+
+        current_distance = dist(coordinates[mol_dict[atom_i]], coordinates[mol_dict[atom_j]])
 
         return current_distance
 
-    def obtain_dist_matrix(self, mol, smiles):
+    def obtain_optimized_coordinates(self, mol, smiles):
         """
-        Obtain the distance matrix for the atoms in the molecule.
+        Obtain the xTB-optimized coordinates for the atoms in the molecule.
 
         Parameters:
-        - mol (rdkit.Chem.Mol): The molecule for which the distance matrix is to be calculated.
+        - mol (rdkit.Chem.Mol): The molecule for which the coordinates are to be obtained.
         - smiles (string): the molecule SMILES string.
 
         Returns:
-        - dist_matrix (numpy.ndarray): The distance matrix representing pairwise distances between atoms.
+        - coordinates (numpy.ndarray): The optimized atomic coordinates.
 
         Notes:
         - The function modifies the atom map numbers in the molecule to ensure correct processing.
-        - It temporarily writes a temporary XYZ file to avoid reordering of atoms by autodE.
-        - The distance matrix is calculated using the autodE library.
+        - The autodE molecule is built in memory from the SMILES-ordered atoms to avoid reordering of atoms by autodE.
+        - The geometry is optimized using the autodE library.
 
         Raises:
         - Any exceptions raised during the optimization process using autodE.
         """
         [atom.SetAtomMapNum(0) for atom in mol.GetAtoms()]
-        get_conformer_with_ade(smiles, mol, output_file_name='tmp.xyz')
         charge = Chem.GetFormalCharge(mol)
 
-        if self.solvent is not None:
-            ade_mol = ade.Molecule('tmp.xyz', name='tmp', charge=charge, solvent_name=self.solvent)
-        else:
-            ade_mol = ade.Molecule('tmp.xyz', name='tmp', charge=charge)
+        ade_tmp_mol = ModifiedMolecule(name='tmp_0', smiles=smiles)
+        ade_mol = get_ade_molecule_from_atoms_and_coords(
+            'tmp', [atom.atomic_symbol for atom in ade_tmp_mol.atoms], ade_tmp_mol.coordinates, charge, self.solvent
+        )
 
         ade_mol.conformers = [conf_gen.get_simanl_conformer(ade_mol)]
         ade_mol.conformers[0].optimise(method=xtb)
-        dist_matrix = distance_matrix(ade_mol.conformers[0].coordinates, ade_mol.conformers[0].coordinates)
     
-        return dist_matrix
+        return ade_mol.conformers[0].coordinates
 
     def save_rp_geometries(self, final_atoms, final_coords):
         """
@@ -592,8 +671,7 @@ class PathGenerator:
         """
         reactant_bonds = [(min(self.atom_map_dict[atom1], self.atom_map_dict[atom2]), max(self.atom_map_dict[atom1], self.atom_map_dict[atom2]))
                       for atom1, atom2 in get_bonds(self.reactant_rdkit_mol)]
-        write_xyz_file_from_atoms_and_coords(final_atoms[0], final_coords[0], 'reactant_geometry.xyz')
-        ade_mol_r = ade.Molecule('reactant_geometry.xyz', name='reactant_geometry', charge=self.charge)
+        ade_mol_r = get_ade_molecule_from_atoms_and_coords('reactant_geometry', final_atoms[0], final_coords[0], self.charge)
 
         # you need to treat organometallic reactions differently because non-bonded atoms may be close 
         # enough for distance-based bond assignment to be triggered
@@ -615,8 +693,7 @@ class PathGenerator:
         """
         product_bonds = [(min(self.atom_map_dict[atom1], self.atom_map_dict[atom2]), max(self.atom_map_dict[atom1], self.atom_map_dict[atom2]))
                      for atom1, atom2 in get_bonds(self.product_rdkit_mol)]
-        write_xyz_file_from_atoms_and_coords(final_atoms[-1], final_coords[-1], 'products_geometry.xyz')
-        ade_mol_p = ade.Molecule('products_geometry.xyz', name='products_geometry', charge=self.charge)
+        ade_mol_p = get_ade_molecule_from_atoms_and_coords('products_geometry', final_atoms[-1], final_coords[-1], self.charge)
 
         # you cannot do this check for organometallic reactions because non-bonded atoms may be close 
         # enough for distance based-bond assignment to be triggered
@@ -700,70 +777,138 @@ def read_energy_coords_file(file_path):
     Returns:
         Tuple: A tuple containing the energy values, coordinates, and atom symbols.
     """
-    all_energies = []
-    all_coords = []
-    all_atoms = []
+    # first pass only counts lines, so that the arrays can be allocated up front
     with open(file_path, 'r') as f:
-        lines = f.readlines()
-        i = 0
-        while i < len(lines):
+        num_atoms = int(f.readline())
+        num_lines = 1 + sum(1 for _ in f)
+    num_frames = num_lines // (num_atoms + 2)
+
+    all_energies = np.empty(num_frames)
+    all_coords = np.empty((num_frames, num_atoms, 3))
+    atoms = []
+
+    with open(file_path, 'r') as f:
+        for frame in range(num_frames):
             # read energy value from line starting with "energy:"
-            if len(lines[i].split()) == 1 and lines[i+1].strip().startswith("energy:"):
-                energy_line = lines[i+1].strip()
-                energy_value = float(energy_line.split()[1])
-                all_energies.append(energy_value)
-                i += 2
-            else:
+            next(f)
+            energy_line = next(f).strip()
+            if not energy_line.startswith("energy:"):
                 raise ValueError(f"Unexpected line while reading energy value: {energy_line}")
-            # read coordinates and symbols for next geometry
-            coords = []
-            atoms = []
-            while i < len(lines) and len(lines[i].split()) != 1:
-                atoms.append(lines[i].split()[0])
-                coords.append(np.array(list(map(float,lines[i].split()[1:]))))
-                i += 1
+            all_energies[frame] = float(energy_line.split()[1])
+            # read coordinates for next geometry, the atom symbols are the same for every frame
+            for i in range(num_atoms):
+                symbol, x, y, z = next(f).split()[:4]
+                if frame == 0:
+                    atoms.append(symbol)
+                all_coords[frame, i] = (float(x), float(y), float(z))
 
-            all_coords.append(np.array(coords))
-            all_atoms.append(atoms)
+    return all_energies, list(all_coords), [atoms] * num_frames
 
-    return np.array(all_energies), all_coords, all_atoms
 
+@dataclass
+class Constraints:
+    """
+    Distance constraints stored as parallel arrays of atom index pairs and target distances.
 
-def determine_potential(all_coords, constraints, force_constant):
+    Attributes:
+        idx_i (np.ndarray): Indices of the first atom of each constrained pair.
+        idx_j (np.ndarray): Indices of the second atom of each constrained pair.
+        distances (np.ndarray): Target distances (in angstrom) of each constrained pair.
     """
-    Determine the potential energy for a set of coordinates based on distance constraints and a force constant.
+    idx_i: np.ndarray
+    idx_j: np.ndarray
+    distances: np.ndarray
 
-    Args:
-        all_coords (list): A list of coordinate arrays.
-        constraints (dict): A dictionary specifying the atom index pairs and their corresponding distances.
-        force_constant (float): The force constant to apply to the constraints.
+    @classmethod
+    def from_dict(cls, constraints):
+        """
+        Create a Constraints object from a dictionary of distance constraints.
 
-    Returns:
-        list: A list of potential energy values.
+        Args:
+            constraints (dict): A dictionary specifying the atom index pairs and their corresponding distances.
+
+        Returns:
+            Constraints: The constraints as parallel arrays.
+        """
+        n_constraints = len(constraints)
+        idx_i = np.fromiter((key[0] for key in constraints), dtype=int, count=n_constraints)
+        idx_j = np.fromiter((key[1] for key in constraints), dtype=int, count=n_constraints)
+        distances = np.fromiter(constraints.values(), dtype=float, count=n_constraints)
+
+        return cls(idx_i, idx_j, distances)
+
+    def __len__(self):
+        return len(self.distances)
+
+    def to_dict(self):
+        """
+        Convert the constraints to a dictionary, e.g., for use with autodE.
+
+        Returns:
+            dict: A dictionary specifying the atom index pairs and their corresponding distances.
+        """
+        return dict(zip(zip(self.idx_i.tolist(), self.idx_j.tolist()), self.distances.tolist()))
+
+    def select(self, mask):
+        """
+        Select a subset of the constraints.
+
+        Args:
+            mask (np.ndarray): Boolean mask (or index array) of the constraints to keep.
+
+        Returns:
+            Constraints: The selected constraints.
+        """
+        return Constraints(self.idx_i[mask], self.idx_j[mask], self.distances[mask])
+
+    def stretched(self, factors):
+        """
+        Scale the target distances of the constraints.
+
+        Args:
+            factors (float or np.ndarray): Stretch factor(s), either one for all constraints or one per constraint.
+
+        Returns:
+            Constraints: The stretched constraints.
+        """
+        return Constraints(self.idx_i, self.idx_j, factors * self.distances)
+
+
+def write_xtb_constraint_input(xtb_input_path, constraints, fc):
     """
-    potentials = []
-    for coords in all_coords:
-        potential = 0
-        dist_matrix = distance_matrix(coords, coords)
-        for key, val in constraints.items():
-            actual_distance = dist_matrix[key[0], key[1]] - val
-            potential += force_constant * angstrom_to_bohr(actual_distance) ** 2
-        potentials.append(potential)
+    Write an xTB input file applying harmonic distance constraints.
 
-    return potentials
+    Args:
+        xtb_input_path (str): Path to the xTB input file to write.
+        constraints (Constraints): The atom index pairs and their corresponding distances.
+        fc (float): Force constant for the constraints.
+    """
+    distance_lines = ''.join(f'    distance: {i + 1}, {j + 1}, {val}\n' for i, j, val in
+                             zip(constraints.idx_i.tolist(), constraints.idx_j.tolist(), constraints.distances.tolist()))
 
+    with open(xtb_input_path, 'w') as f:
+        f.write(f'$constrain\n    force constant={fc}\n{distance_lines}$end\n')
 
-def angstrom_to_bohr(distance_angstrom):
+
+def determine_potential(all_coords, constraints, force_constant):
     """
-    Convert distance in angstrom to bohr.
+    Determine the potential energy for a set of coordinates based on distance constraints and a force constant.
 
     Args:
-        distance_angstrom (float): Distance in angstrom.
+        all_coords (list): A list of coordinate arrays.
+        constraints (Constraints): The atom index pairs and their corresponding distances.
+        force_constant (float): The force constant to apply to the constraints.
 
     Returns:
-        float: Distance in bohr.
+        list: A list of potential energy values.
     """
-    return distance_angstrom * 1.88973
+    # only the constrained pairs are evaluated, all frames are treated in a single pass
+    frames = np.stack(all_coords).astype(np.float64, copy=False)
+    displacements = frames[:, constraints.idx_i, :] - frames[:, constraints.idx_j, :]
+    distances = np.sqrt(np.einsum('fkx,fkx->fk', displacements, displacements))
+    potentials = (force_constant * (ang_bohr * (distances - constraints.distances)) ** 2).sum(axis=1)
+
+    return potentials.tolist()
 
 
 def get_path_xyz_files(atoms, coords, force_constant):
@@ -807,15 +952,35 @@ def write_xyz_file_from_atoms_and_coords(atoms, coords, filename):
     Returns:
         str: The name of the written XYZ file.
     """
+    # format the full atom block at once on plain Python floats
+    atom_block = ''.join(f"{atom} {x:.6f} {y:.6f} {z:.6f}\n" for atom, (x, y, z) in zip(atoms, np.asarray(coords).tolist()))
+
     with open(filename, 'w') as f:
-        f.write(f'{len(atoms)}\n')
-        f.write("test \n")
-        for i, coord in enumerate(coords):
-            x, y, z = coord
-            f.write(f"{atoms[i]} {x:.6f} {y:.6f} {z:.6f}\n")
+        f.write(f'{len(atoms)}\ntest \n{atom_block}')
     return filename
 
 
+def get_ade_molecule_from_atoms_and_coords(name, atoms, coords, charge, solvent_name=None):
+    """
+    Create an autodE molecule directly from atom symbols and coordinates, without writing an XYZ file.
+
+    Args:
+        name (str): The name of the molecule.
+        atoms (list): The list of atom symbols.
+        coords (list): The list of atomic coordinates.
+        charge (int): The charge of the molecule.
+        solvent_name (str, optional): The name of the solvent.
+
+    Returns:
+        ade.Molecule: The molecule, with its molecular graph assigned based on the interatomic distances.
+    """
+    ade_atoms = [Atom(atom, *coord) for atom, coord in zip(atoms, np.asarray(coords).tolist())]
+    ade_mol = ade.Molecule(name=name, atoms=ade_atoms, charge=charge, solvent_name=solvent_name)
+    make_graph(ade_mol)
+
+    return ade_mol
+
+
 def find_stereocenters(mol):
     """
     Identify stereocenters (chirality and cis/trans bonds) in a molecule.
@@ -855,22 +1020,23 @@ def find_stereocenters(mol):
     return stereocenters
 
 
-def get_stereochemistry_from_conformer_xyz(xyz_file, smiles):
+def get_stereochemistry_from_conformer_xyz(xyz_file, smiles, no_stereo_mol=None):
     """
     Get stereochemistry information from an XYZ file.
 
     Args:
         xyz_file: The XYZ file.
         smiles: The SMILES string.
+        no_stereo_mol (optional): The molecule without stereochemistry, as returned by get_mol_without_stereochemistry.
+            Pass it in when processing many conformers of the same molecule to avoid re-parsing the SMILES.
 
     Returns:
         object: The molecule with stereochemistry.
         list: The stereochemistry information.
     """
-    mol = Chem.MolFromSmiles(smiles, ps)
-    Chem.RemoveStereochemistry(mol)
-    no_stereo_smiles = Chem.MolToSmiles(mol)
-    mol = add_xyz_conformer(no_stereo_smiles, xyz_file)
+    if no_stereo_mol is None:
+        no_stereo_mol = get_mol_without_stereochemistry(smiles)
+    mol = add_xyz_conformer(no_stereo_mol, xyz_file)
 
     mol.GetConformer()
     Chem.AssignStereochemistryFrom3D(mol)
@@ -879,29 +1045,42 @@ def get_stereochemistry_from_conformer_xyz(xyz_file, smiles):
     return stereochemistry
 
 
-def add_xyz_conformer(smiles, xyz_file):
+def get_mol_without_stereochemistry(smiles):
     """
-    Add an XYZ conformer to the molecule.
+    Get the molecule without stereochemistry information.
 
     Args:
         smiles: The SMILES string.
+
+    Returns:
+        object: The molecule parsed from the SMILES without stereochemistry.
+    """
+    mol = Chem.MolFromSmiles(smiles, ps)
+    Chem.RemoveStereochemistry(mol)
+    no_stereo_smiles = Chem.MolToSmiles(mol)
+
+    return Chem.MolFromSmiles(no_stereo_smiles, ps)
+
+
+def add_xyz_conformer(template_mol, xyz_file):
+    """
+    Add an XYZ conformer to a copy of the molecule.
+
+    Args:
+        template_mol: The molecule (left unmodified).
         xyz_file: The XYZ file.
 
     Returns:
         object: The molecule with the added conformer.
     """
-    mol = Chem.MolFromSmiles(smiles, ps)
+    mol = Chem.Mol(template_mol)
     
     with open(xyz_file, 'r') as f:
         lines = f.readlines()
         num_atoms = int(lines[0])
         coords = []
-        symbols = []
         for i in range(2, num_atoms+2):
-            line = lines[i].split()
-            symbol = line[0]
-            x, y, z = map(float, line[1:])
-            symbols.append(symbol)
+            x, y, z = map(float, lines[i].split()[1:4])
             coords.append((x, y, z))
 
     conformer = Chem.Conformer(num_atoms)
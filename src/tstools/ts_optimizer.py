@@ -180,7 +180,7 @@ class TSOptimizer:
         for _ in range(5):
             energies, potentials, path_xyz_files = path.get_path()
             if energies is not None:
-                true_energies = list(np.array(energies) - np.array(potentials))
+                true_energies = np.asarray(energies) - np.asarray(potentials)
                 guesses_list = self.determine_and_filter_local_maxima(true_energies, path_xyz_files, path.charge)
                 if len(guesses_list) > 0:
                     return guesses_list
@@ -192,7 +192,7 @@ class TSOptimizer:
         Determine and filter local maxima in the path.
 
         Parameters:
-        - true_energies (list): List of true energy values.
+        - true_energies (np.ndarray): Array of true energy values.
         - path_xyz_files (list): List of path XYZ files.
         - charge: Charge information.
 
@@ -391,13 +391,12 @@ def find_local_max_indices(numbers):
     Find indices of local maxima in a list of numbers.
 
     Parameters:
-    - numbers (list): List of numbers.
+    - numbers (list or np.ndarray): List of numbers.
 
     Returns:
-    - list: List of indices corresponding to local maxima.
+    - list: List of indices corresponding to local maxima, in descending order.
     """
-    local_max_indices = []
-    for i in range(len(numbers) - 2, 0, -1):
-        if numbers[i] > numbers[i - 1] and numbers[i] > numbers[i + 1]:
-            local_max_indices.append(i)
-    return local_max_indices
+    numbers = np.asarray(numbers)
+    is_local_max = (numbers[1:-1] > numbers[:-2]) & (numbers[1:-1] > numbers[2:])
+
+    return (np.flatnonzero(is_local_max)[::-1] + 1).tolist()
@@ -1,4 +1,5 @@
 import os
+import numpy as np
 from rdkit import Chem
 import subprocess
 import shutil
@@ -61,11 +62,11 @@ def write_xyz_file_from_ade_atoms(atoms, filename):
         atoms: The ADE atoms object.
         filename: The name of the XYZ file to write.
     """
+    coords = np.array([atom.coord for atom in atoms], dtype=float).reshape(-1, 3).tolist()
+    atom_block = ''.join(f'{atom.atomic_symbol} {x:.6f} {y:.6f} {z:.6f}\n' for atom, (x, y, z) in zip(atoms, coords))
+
     with open(filename, 'w') as f:
-        f.write(str(len(atoms)) + '\n')
-        f.write('Generated by write_xyz_file()\n')
-        for atom in atoms:
-            f.write(f'{atom.atomic_symbol} {atom.coord[0]:.6f} {atom.coord[1]:.6f} {atom.coord[2]:.6f}\n')
+        f.write(f'{len(atoms)}\nGenerated by write_xyz_file()\n{atom_block}')
 
 
 def write_final_geometry_to_xyz(log_file_path):